@@ -1,7 +1,8 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import joblib
-import os
+
+from logic import ACTIVITY_MULTIPLIERS, BMI_EDGES, BMI_LABELS, load_models, predict_calories, analyze_health, calculate_smart_protein_goal
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(
@@ -11,244 +12,198 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- 2. LOAD MODELS ---
-@st.cache_resource
-def load_models():
-   
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    
-    class_model_path = os.path.join(current_dir, 'model_xgb.pkl')
-    reg_model_path = os.path.join(current_dir, 'model_reg.pkl')
+# --- 2. FORM LAYOUT ---
+# Nutrient table columns: name -> (header shown to the user, edit step)
+NUTRIENT_COLUMNS = {
+    'Fat': ("Total Fat (g)", 0.1),
+    'Carbs': ("Carbs (g)", 0.1),
+    'Protein': ("Protein (g)", 0.1),
+    'Fiber': ("Fiber (g)", 0.1),
+    'Sugar': ("Sugar (g)", 0.1),
+    'SatFat': ("Sat. Fat (g)", 0.1),
+    'Sodium': ("Sodium (mg)", 1.0),
+    'Cholesterol': ("Cholest. (mg)", 1.0),
+    'Water': ("Water Content (g)", 1.0)
+}
+EMPTY_NUTRIENTS = pd.DataFrame([dict.fromkeys(NUTRIENT_COLUMNS, 0.0)])
+
+# --- 3. CACHED PREDICTION ---
+@st.cache_data(max_entries=1024, show_spinner=False)
+def _cached_predict(_model_class, _model_reg, fat, carbs, protein, fiber, sugar, sat_fat, sodium, cholesterol, water):
+    # Model arguments are prefixed with "_" so Streamlit keys the cache on the nutrient values only
+    predicted_calories = predict_calories(_model_reg, fat, carbs, protein, fiber)
+    total_mass = fat + carbs + protein + water + (sodium/1000) + (cholesterol/1000)
+    prediction, prob_healthy = analyze_health(
+        _model_class, predicted_calories, total_mass,
+        fat, sugar, protein, fiber, sodium, sat_fat, cholesterol, water
+    )
+    return predicted_calories, prediction, prob_healthy
 
+# --- 4. MAIN APP UI ---
+@st.fragment
+def _profile_sidebar():
+    # Runs as a fragment, so editing the profile only reruns the sidebar
+    st.header("👤 Your Profile")
+    st.write("Customize your goals for accuracy.")
     
-    if not os.path.exists(class_model_path) or not os.path.exists(reg_model_path):
-        return None, None
-    
-    try:
-        model_class = joblib.load(class_model_path)
-        model_reg = joblib.load(reg_model_path)
-        return model_class, model_reg
-    except Exception as e:
-        st.error(f"Error loading models: {e}")
-        return None, None
-    
-# --- 3. LOGIC FUNCTIONS ---
-def predict_calories(model_reg, fat, carbs, protein, fiber):
-    data = pd.DataFrame([{
-        'Fat': fat,
-        'Protein': protein,
-        'Carbohydrate': carbs,
-        'Fiber': fiber
-    }])
-    # Prevent negative calories if input is empty
-    prediction = model_reg.predict(data)[0]
-    return max(0, prediction)
-
-def analyze_health(model_class, predicted_cals, total_mass, fat, sugar, protein, fiber, sodium, sat_fat, cholesterol, water):
-    if total_mass == 0: 
-        return None, None
-    
-    sugar_fiber_ratio = sugar / fiber if fiber > 0 else 0.0
-    
-    
-    prot_density = protein / total_mass
-    sugar_density = sugar / total_mass
+    weight = st.number_input("Weight (kg)", min_value=30.0, max_value=200.0, value=70.0, step=0.5)
+    height = st.number_input("Height (cm)", min_value=100, max_value=250, value=175, step=1)
     
-    data = pd.DataFrame([{
-        'Calorie_Density': predicted_cals / total_mass,
-        'Fat_Density': fat / total_mass,
-        'Sugar_Density': sugar / total_mass,
-        'Protein_Density': prot_density,
-        'Fiber_Density': fiber / total_mass,
-        'Saturated_Fat_Density': sat_fat / total_mass,
-        'Cholesterol_Density': cholesterol / total_mass,
-        'Water_Density': water / total_mass,
-        'Sugar_Fiber_Ratio': sugar_fiber_ratio,
-        'Sodium_Density': sodium / total_mass
-    }])
-
+    activity = st.selectbox(
+        "Activity Level",
+        list(ACTIVITY_MULTIPLIERS),
+        index=2
+    )
     
-    prediction = model_class.predict(data)[0]
-    prob_healthy = model_class.predict_proba(data)[0][1]
+    daily_protein_goal, bmi = calculate_smart_protein_goal(weight, height, activity)
     
-    if prediction == 0:
-        if (prot_density > 0.15) and (sugar_density < 0.02):
-            prediction = 1 
-            prob_healthy = 0.85 
-            
-    return prediction, prob_healthy
-def calculate_smart_protein_goal(weight_kg, height_cm, activity_level):
-    """
-    Calculates protein based on Lean Body Mass approximation.
-    If BMI > 25, it adjusts the weight down to prevent over-estimation.
-    """
+    st.divider()
+    st.metric("Daily Protein Goal", f"{daily_protein_goal:.0f} g")
     
-    height_m = height_cm / 100
-    bmi = weight_kg / (height_m ** 2)
     
-    if bmi > 30:
-        
-        ideal_weight = 25 * (height_m ** 2)
-        
-        calculation_weight = ideal_weight + 0.25 * (weight_kg - ideal_weight)
-    else:
-        
-        calculation_weight = weight_kg
-
-    multipliers = {
-        "Sedentary (Office Job, No Exercise)": 0.8,
-        "Lightly Active (Exercise 1-3 days/week)": 1.2,
-        "Moderately Active (Exercise 3-5 days/week)": 1.5,
-        "Very Active (Hard Exercise 6-7 days/week)": 1.7,
-        "Athlete / Muscle Building (Hypertrophy)": 2.0
-    }
-    multiplier = multipliers.get(activity_level, 1.2)
+    bmi_category = int(np.searchsorted(BMI_EDGES, bmi, side="right"))
+    st.caption(f"BMI: {bmi:.1f} ({BMI_LABELS[bmi_category]})")
+    if bmi_category == len(BMI_EDGES):
+        st.info("Since BMI is high, we adjusted the protein goal to match your Lean Body Mass, not total weight.")
     
-    return calculation_weight * multiplier, bmi
-# --- 4. MAIN APP UI ---
-def main():
-    # --- SIDEBAR: USER STATS ---
-    with st.sidebar:
-        st.header("👤 Your Profile")
-        st.write("Customize your goals for accuracy.")
-        
-        weight = st.number_input("Weight (kg)", min_value=30.0, max_value=200.0, value=70.0, step=0.5)
-        height = st.number_input("Height (cm)", min_value=100, max_value=250, value=175, step=1)
-        
-        activity = st.selectbox(
-            "Activity Level",
-            [
-                "Sedentary (Office Job, No Exercise)",
-                "Lightly Active (Exercise 1-3 days/week)",
-                "Moderately Active (Exercise 3-5 days/week)",
-                "Very Active (Hard Exercise 6-7 days/week)",
-                "Athlete / Muscle Building (Hypertrophy)"
-            ],
-            index=2
-        )
-        
-        daily_protein_goal, bmi = calculate_smart_protein_goal(weight, height, activity)
-        
-        st.divider()
-        st.metric("Daily Protein Goal", f"{daily_protein_goal:.0f} g")
-        
-        
-        if bmi < 18.5:
-            st.caption(f"BMI: {bmi:.1f} (Underweight)")
-        elif bmi < 25:
-            st.caption(f"BMI: {bmi:.1f} (Normal)")
-        elif bmi < 30:
-            st.caption(f"BMI: {bmi:.1f} (Overweight)")
-        else:
-            st.caption(f"BMI: {bmi:.1f} (Obese - Weight Adjusted)")
-            st.info("Since BMI is high, we adjusted the protein goal to match your Lean Body Mass, not total weight.")
-        
-        st.divider()
-        st.info("Tip: Press **TAB** to move through the form quickly!")
-
-    st.title("AI Nutritionist")
-    st.markdown("### Check if your food is *actually* healthy.")
-    st.write("---")
-
-    # Load Models
-    model_class, model_reg = load_models()
-    if model_class is None:
-        st.error("Model files missing! Please check your folder.")
-        return
-
+    st.divider()
+    st.info("Tip: Press **TAB** to move through the form quickly!")
+
+    # The analysis fragment reruns on its own, so it reads the latest goal from here
+    previous_goal = st.session_state.get("daily_protein_goal")
+    st.session_state["daily_protein_goal"] = daily_protein_goal
+    # Results on screen were drawn against the old goal: rerun the whole app so they are redrawn too
+    if previous_goal is not None and previous_goal != daily_protein_goal and "analysis" in st.session_state:
+        st.rerun(scope="app")
+
+@st.fragment
+def _analysis_fragment(model_class, model_reg):
+    # Runs as a fragment, so typing in the form and submitting it only reruns this block
     # --- THE FORM ---
     with st.form("nutrition_form"):
         col_main, col_spacer = st.columns([2, 1])
         with col_main:
             name = st.text_input("Food Name", placeholder="e.g. Greek Yogurt")
 
-        st.write("#### Macro Nutrients")
-        c1, c2, c3, c4 = st.columns(4)
-        with c1:
-            fat = st.number_input("Total Fat (g)", min_value=0.0, step=0.1)
-        with c2:
-            carbs = st.number_input("Carbs (g)", min_value=0.0, step=0.1)
-        with c3:
-            protein = st.number_input("Protein (g)", min_value=0.0, step=0.1)
-        with c4:
-            fiber = st.number_input("Fiber (g)", min_value=0.0, step=0.1)
-
-        st.write("#### Micro Nutrients & Details")
-        c5, c6, c7, c8 = st.columns(4)
-        with c5:
-            sugar = st.number_input("Sugar (g)", min_value=0.0, step=0.1)
-        with c6:
-            sat_fat = st.number_input("Sat. Fat (g)", min_value=0.0, step=0.1)
-        with c7:
-            sodium = st.number_input("Sodium (mg)", min_value=0.0, step=1.0)
-        with c8:
-            cholesterol = st.number_input("Cholest. (mg)", min_value=0.0, step=1.0)
-        
-        st.write("#### Hydration")
-        water = st.number_input("Water Content (g)", min_value=0.0, step=1.0)
+        st.write("#### Nutrients")
+        # One editable row instead of nine number inputs: a single widget to build and reconcile per rerun
+        edited = st.data_editor(
+            EMPTY_NUTRIENTS,
+            num_rows="fixed",
+            hide_index=True,
+            width="stretch",
+            column_config={
+                column: st.column_config.NumberColumn(label, min_value=0.0, step=step)
+                for column, (label, step) in NUTRIENT_COLUMNS.items()
+            }
+        )
+        # Cleared cells come back empty, treat them as zero like an untouched number input
+        fat, carbs, protein, fiber, sugar, sat_fat, sodium, cholesterol, water = (
+            float(v) for v in edited.iloc[0].fillna(0.0)
+        )
 
         st.write("") 
         submitted = st.form_submit_button("ANALYZE FOOD", use_container_width=True, type="primary")
 
     # --- RESULTS SECTION ---
     if submitted:
-        # 1. Calculate Mass & Calories
-        predicted_calories = predict_calories(model_reg, fat, carbs, protein, fiber)
+        # Round once, so the empty check and the cached prediction see the same values
+        # (and near-identical resubmits hit the cache)
+        fat, carbs, protein, fiber, sugar, sat_fat, sodium, cholesterol, water = (
+            round(v, 2) for v in (fat, carbs, protein, fiber, sugar, sat_fat, sodium, cholesterol, water)
+        )
+
+        # 1. Calculate Mass
         total_mass = fat + carbs + protein + water + (sodium/1000) + (cholesterol/1000)
         
         
         if total_mass == 0:
+            st.session_state.pop("analysis", None)
             st.warning("Please enter some nutrient values before analyzing.")
         else:
             with st.spinner("AI is crunching the numbers..."):
-                prediction, prob_healthy = analyze_health(
-                    model_class, predicted_calories, total_mass,
-                    fat, sugar, protein, fiber, sodium, sat_fat, cholesterol, water
+                # 2. Calories & Verdict
+                predicted_calories, prediction, prob_healthy = _cached_predict(
+                    model_class, model_reg,
+                    fat, carbs, protein, fiber, sugar, sat_fat, sodium, cholesterol, water
                 )
 
-                if prediction is None:
-                    st.error("Error calculating health score.")
-                else:
-                    st.divider()
-                    st.header(f"Results for: {name if name else 'Food Item'}")
-
-                    # --- ROW 1: BASIC STATS ---
-                    m1, m2, m3 = st.columns(3)
-                    m1.metric("Calculated Calories", f"{predicted_calories:.0f} kcal")
-                    
-                    if prediction == 1:
-                        verdict = "HEALTHY"
-                        conf_score = prob_healthy
-                        color_box = st.success
-                    else:
-                        verdict = "UNHEALTHY"
-                        conf_score = 1 - prob_healthy if prob_healthy is not None else 0.0
-                        color_box = st.error
-
-                    m2.metric("AI Verdict", verdict)
-                    m3.metric("Confidence", f"{conf_score:.1%}")
-                    
-                    # --- ROW 2: PROTEIN ANALYSIS ---
-                    st.subheader("Protein Analysis")
-                    
-                    protein_percentage = (protein / daily_protein_goal)
-                    bar_progress = min(protein_percentage, 1.0)
-                    
-                    p_col1, p_col2 = st.columns([3, 1])
-                    
-                    with p_col1:
-                        st.write(f"This food provides **{protein:.1f}g** of protein.")
-                        st.progress(bar_progress)
-                        st.caption(f"That's **{protein_percentage:.1%}** of your daily goal ({daily_protein_goal:.0f}g).")
-                    
-                    with p_col2:
-                        if protein_percentage >= 0.20:
-                            st.success("High Protein!")
-                        elif protein_percentage >= 0.10:
-                            st.info("Good Source")
-                        else:
-                            st.write("Low Protein")
+            if prediction is None:
+                st.session_state.pop("analysis", None)
+                st.error("Error calculating health score.")
+            else:
+                # Kept in session state so the results survive reruns that don't resubmit the form
+                st.session_state["analysis"] = {
+                    "name": name,
+                    "protein": protein,
+                    "predicted_calories": predicted_calories,
+                    "prediction": prediction,
+                    "prob_healthy": prob_healthy,
+                }
+
+    analysis = st.session_state.get("analysis")
+    if analysis is not None:
+        daily_protein_goal = st.session_state["daily_protein_goal"]
+        protein = analysis["protein"]
+        prediction = analysis["prediction"]
+        prob_healthy = analysis["prob_healthy"]
+
+        st.divider()
+        st.header(f"Results for: {analysis['name'] if analysis['name'] else 'Food Item'}")
+
+        # --- ROW 1: BASIC STATS ---
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Calculated Calories", f"{analysis['predicted_calories']:.0f} kcal")
+        
+        if prediction == 1:
+            verdict = "HEALTHY"
+            conf_score = prob_healthy
+            color_box = st.success
+        else:
+            verdict = "UNHEALTHY"
+            conf_score = 1 - prob_healthy if prob_healthy is not None else 0.0
+            color_box = st.error
+
+        m2.metric("AI Verdict", verdict)
+        m3.metric("Confidence", f"{conf_score:.1%}")
+        
+        # --- ROW 2: PROTEIN ANALYSIS ---
+        st.subheader("Protein Analysis")
+        
+        protein_percentage = (protein / daily_protein_goal)
+        bar_progress = min(protein_percentage, 1.0)
+        
+        p_col1, p_col2 = st.columns([3, 1])
+        
+        with p_col1:
+            st.write(f"This food provides **{protein:.1f}g** of protein.")
+            st.progress(bar_progress)
+            st.caption(f"That's **{protein_percentage:.1%}** of your daily goal ({daily_protein_goal:.0f}g).")
+        
+        with p_col2:
+            if protein_percentage >= 0.20:
+                st.success("High Protein!")
+            elif protein_percentage >= 0.10:
+                st.info("Good Source")
+            else:
+                st.write("Low Protein")
+
+def main():
+    # --- SIDEBAR: USER STATS ---
+    with st.sidebar:
+        _profile_sidebar()
+
+    st.title("AI Nutritionist")
+    st.markdown("### Check if your food is *actually* healthy.")
+    st.write("---")
+
+    # Load Models
+    model_class, model_reg = load_models()
+    if model_class is None:
+        st.error("Model files missing! Please check your folder.")
+        return
+
+    _analysis_fragment(model_class, model_reg)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,200 @@
+import streamlit as st
+import numpy as np
+import json
+import hashlib
+import logging
+import os
+import threading
+import xgboost as xgb
+from pathlib import Path
+
+# Optional: with treelite + tl2cgen installed, the classifier can be compiled to a native library
+# offline (`python food/logic.py`) and load_models picks it up
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    tl2cgen = None
+
+# The compiled predictor is shared by every session (st.cache_resource), but tl2cgen only allows
+# one thread at a time in Predictor.predict
+_predictor_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+# --- 1. LOAD MODELS ---
+# Models are scored from raw NumPy rows, so inputs must follow the training column order (see food_ml.ipynb)
+REG_FEATURES = ['Fat', 'Protein', 'Carbohydrate', 'Fiber']
+CLASS_FEATURES = [
+    'Calorie_Density', 'Fat_Density', 'Sugar_Density', 'Protein_Density', 'Fiber_Density',
+    'Saturated_Fat_Density', 'Cholesterol_Density', 'Water_Density', 'Sugar_Fiber_Ratio', 'Sodium_Density'
+]
+
+MODEL_DIR = Path(__file__).resolve().parent
+
+@st.cache_resource
+def load_models():
+    # One file holds both models: the classifier booster, with the calorie regression's
+    # coefficients stored as booster attributes (written by the last cell of food_ml.ipynb)
+    model_path = MODEL_DIR / 'models.ubj'
+
+    # No existence pre-check: a missing file surfaces as FileNotFoundError from the read itself
+    try:
+        # Native XGBoost format loads straight into a Booster, skipping the pickle and sklearn wrapper
+        model_bytes = model_path.read_bytes()
+        booster_class = xgb.Booster()
+        booster_class.load_model(bytearray(model_bytes))
+        reg_features = json.loads(booster_class.attr('reg_features'))
+        model_reg = (
+            np.array(json.loads(booster_class.attr('reg_coef')), dtype=np.float64),
+            float(json.loads(booster_class.attr('reg_intercept')))
+        )
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        st.error(f"Error loading models: {e}")
+        return None, None
+
+    if booster_class.feature_names != CLASS_FEATURES or reg_features != REG_FEATURES:
+        st.error("Model features don't match the app's input layout.")
+        return None, None
+
+    compiled_class = load_compiled_classifier(model_bytes)
+    if compiled_class is not None:
+        return compiled_class, model_reg
+
+    return booster_class, model_reg
+
+def compiled_classifier_path(model_bytes):
+    # Named after the model file's hash, so a retrained models.ubj never gets scored by a stale build
+    return MODEL_DIR / f"model_class-{hashlib.sha256(model_bytes).hexdigest()[:12]}.so"
+
+def load_compiled_classifier(model_bytes):
+    # Only loads a library built beforehand by compile_classifier; never compiles on the page load
+    libpath = compiled_classifier_path(model_bytes)
+    if tl2cgen is None or not libpath.is_file():
+        return None
+    try:
+        # The app scores one row per call, so a single thread beats spinning up an OpenMP pool
+        return tl2cgen.Predictor(str(libpath), nthread=1)
+    except Exception:
+        # The booster scores the same, just slower; drop the broken library so it gets rebuilt
+        logger.warning("Could not load %s, scoring with XGBoost instead", libpath, exc_info=True)
+        libpath.unlink(missing_ok=True)
+        return None
+
+def compile_classifier():
+    # Offline build step: single-row scoring through generated C is several times faster than
+    # the XGBoost runtime. Re-run after every retrain of models.ubj
+    model_bytes = (MODEL_DIR / 'models.ubj').read_bytes()
+    booster_class = xgb.Booster()
+    booster_class.load_model(bytearray(model_bytes))
+    libpath = compiled_classifier_path(model_bytes)
+
+    # Build under a temporary name and move it into place, so an interrupted build never
+    # leaves a partial library under the final name
+    tmp_path = libpath.with_name(f"{libpath.stem}.{os.getpid()}.tmp.so")
+    try:
+        tl_model = treelite.frontend.from_xgboost(booster_class)
+        tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=str(tmp_path), params={'parallel_comp': 8})
+        os.replace(tmp_path, libpath)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    # Libraries built for earlier models are never loaded again
+    for old_libpath in MODEL_DIR.glob("model_class-*.so"):
+        if old_libpath != libpath:
+            old_libpath.unlink()
+    return libpath
+    
+# --- 2. LOGIC FUNCTIONS ---
+# Batch scorers take an (N, F) float array in REG_FEATURES / CLASS_FEATURES order and return length-N arrays;
+# the single-item functions below are thin wrappers that build a (1, F) row
+def predict_calories_batch(model_reg, features):
+    coef, intercept = model_reg
+    # Linear model, so score the rows directly instead of going through a DataFrame
+    predictions = features @ coef
+    predictions += intercept
+    # Prevent negative calories if input is empty (clamped in place, no extra array)
+    np.maximum(predictions, 0.0, out=predictions)
+    return predictions
+
+def analyze_health_batch(model_class, features):
+    # Raw margin in one traversal; the verdict is its sign and P(healthy) is the logistic
+    # sigmoid binary:logistic would have applied
+    if isinstance(model_class, xgb.Booster):
+        # inplace_predict skips the DMatrix copy
+        margin = model_class.inplace_predict(features, predict_type="margin")
+    else:
+        # Compiled tl2cgen predictor, shape (N, 1, 1) for a binary model
+        with _predictor_lock:
+            margin = model_class.predict(tl2cgen.DMatrix(features), pred_margin=True).reshape(-1)
+    margin = margin.astype(np.float64)
+    prob_healthy = 1.0 / (1.0 + np.exp(-margin))
+    predictions = (margin > 0).astype(int)
+
+    # High-protein, low-sugar foods count as healthy even when the model disagrees
+    override = (predictions == 0) & (features[:, 3] > 0.15) & (features[:, 2] < 0.02)
+    predictions[override] = 1
+    prob_healthy[override] = 0.85
+
+    return predictions, prob_healthy
+
+def predict_calories(model_reg, fat, carbs, protein, fiber):
+    data = np.array([[fat, protein, carbs, fiber]], dtype=np.float64)
+    return float(predict_calories_batch(model_reg, data)[0])
+
+def analyze_health(model_class, predicted_cals, total_mass, fat, sugar, protein, fiber, sodium, sat_fat, cholesterol, water):
+    if total_mass == 0: 
+        return None, None
+    
+    sugar_fiber_ratio = sugar / fiber if fiber > 0 else 0.0
+    
+    # One vectorised divide turns the raw amounts into the per-gram densities (CLASS_FEATURES order);
+    # slot 8 is the ratio, not a density, so it is filled in afterwards
+    raw = np.array([predicted_cals, fat, sugar, protein, fiber, sat_fat, cholesterol, water, 0.0, sodium], dtype=np.float32)
+    data = np.empty((1, raw.size), dtype=np.float32)
+    np.divide(raw, total_mass, out=data[0])
+    data[0, 8] = sugar_fiber_ratio
+
+    predictions, prob_healthy = analyze_health_batch(model_class, data)
+    return int(predictions[0]), float(prob_healthy[0])
+
+# Protein grams per kg of body weight for each activity level (also the sidebar's options, in order)
+ACTIVITY_MULTIPLIERS = {
+    "Sedentary (Office Job, No Exercise)": 0.8,
+    "Lightly Active (Exercise 1-3 days/week)": 1.2,
+    "Moderately Active (Exercise 3-5 days/week)": 1.5,
+    "Very Active (Hard Exercise 6-7 days/week)": 1.7,
+    "Athlete / Muscle Building (Hypertrophy)": 2.0
+}
+
+# BMI category boundaries: a BMI at or above edge i falls in label i + 1
+BMI_EDGES = np.array([18.5, 25.0, 30.0])
+BMI_LABELS = ("Underweight", "Normal", "Overweight", "Obese - Weight Adjusted")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def calculate_smart_protein_goal(weight_kg, height_cm, activity_level):
+    """
+    Calculates protein based on Lean Body Mass approximation.
+    If BMI > 25, it adjusts the weight down to prevent over-estimation.
+    """
+    
+    height_m = height_cm / 100
+    bmi = weight_kg / (height_m ** 2)
+    
+    if bmi > 30:
+        
+        ideal_weight = 25 * (height_m ** 2)
+        
+        calculation_weight = ideal_weight + 0.25 * (weight_kg - ideal_weight)
+    else:
+        
+        calculation_weight = weight_kg
+
+    multiplier = ACTIVITY_MULTIPLIERS.get(activity_level, 1.2)
+    
+    return calculation_weight * multiplier, bmi
+
+if __name__ == "__main__":
+    print(f"Compiled classifier written to {compile_classifier()}")
@@ -6,8 +6,57 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 
 class FastFoodPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class ArrowBatchPipeline:
+    # Columns yielded by FoodScraperSpider.parse_food; nutrient values are floats or None
+    schema = pa.schema(
+        [('Name', pa.string())]
+        + [(field, pa.float64()) for field in (
+            'Calories', 'Fat', 'Carbohydrate', 'Protein', 'Sugars', 'Fiber',
+            'Sodium', 'Saturated_Fat', 'Cholesterol', 'Water'
+        )]
+    )
+
+    def __init__(self, path, batch_size):
+        self.path = path
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            crawler.settings.get('PARQUET_OUTPUT', str(Path(__file__).resolve().parent / 'food_data.parquet')),
+            crawler.settings.getint('PARQUET_BATCH_SIZE', 1024),
+        )
+
+    def open_spider(self, spider):
+        self.buffer = []
+        # Opened on the first flush, so a crawl that scrapes nothing leaves the previous file alone
+        self.writer = None
+
+    def process_item(self, item, spider):
+        # Buffer items and write them as one Arrow record batch instead of serialising each one
+        self.buffer.append(ItemAdapter(item).asdict())
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        return item
+
+    def close_spider(self, spider):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+    def flush(self):
+        if self.buffer:
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, self.schema)
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self.buffer, schema=self.schema))
+            self.buffer = []
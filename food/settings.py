@@ -7,6 +7,8 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from pathlib import Path
+
 BOT_NAME = "food"
 
 SPIDER_MODULES = ["food.spiders"]
@@ -58,9 +60,13 @@ DOWNLOAD_DELAY = 1
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "fast_food.pipelines.FastFoodPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "food.pipelines.ArrowBatchPipeline": 300,
+}
+# Scraped items are written here in Parquet record batches of PARQUET_BATCH_SIZE rows
+# (next to this file, so it doesn't depend on where `scrapy crawl` is run from)
+PARQUET_OUTPUT = str(Path(__file__).resolve().parent / "food_data.parquet")
+PARQUET_BATCH_SIZE = 1024
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
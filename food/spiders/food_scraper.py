@@ -1,8 +1,19 @@
 import scrapy
 import re
+from lxml import etree
 
 class FoodScraperSpider(scrapy.Spider):
     name = "food_scraper"
+    number_re = re.compile(r'[\d\.]+')
+    # Compiled once and run on the raw lxml tree, skipping a SelectorList per call
+    rows_xpath = etree.XPath("//table[contains(@class, 'results')]//tr[position()>1]")
+    name_xpath = etree.XPath(".//td[1]/a/text()")
+    link_xpath = etree.XPath(".//td[1]/a/@href")
+    next_page_xpath = etree.XPath("//a[text()='Next']/@href")
+    calories_xpath = etree.XPath('//td[@id="calories"]/text()')
+    nutrient_rows_xpath = etree.XPath("//tr[td[@class='right']/text()]")
+    nutrient_label_xpath = etree.XPath("normalize-space(td[1])")
+    nutrient_value_xpath = etree.XPath("td[@class='right']/text()")
     allowed_domains = ["www.nutritionvalue.org"]
     
     start_urls = [
@@ -17,6 +28,20 @@ class FoodScraperSpider(scrapy.Spider):
         'FEED_EXPORT_ENCODING': 'utf-8',
         'DOWNLOAD_DELAY': 1,
         'CONCURRENT_REQUESTS': 16,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
+        'AUTOTHROTTLE_ENABLED': True,
+        # Re-crawls while iterating on the dataset replay pages from disk instead of the network
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_EXPIRATION_SECS': 86400,
+        'HTTPCACHE_STORAGE': 'scrapy.extensions.httpcache.FilesystemCacheStorage',
+        # Don't cache retryable errors, or retries and later re-crawls would replay them from disk
+        'HTTPCACHE_IGNORE_HTTP_CODES': [408, 429, 500, 502, 503, 504, 522, 524],
+        # HTTP/2 multiplexes the product page requests over one connection (needs Twisted[http2])
+        'DOWNLOAD_HANDLERS': {
+            'https': 'scrapy.core.downloader.handlers.http2.H2DownloadHandler',
+        },
+        'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
+        'DNS_RESOLVER': 'scrapy.resolver.CachingHostnameResolver',
     }
 
     def start_requests(self):
@@ -32,14 +57,10 @@ class FoodScraperSpider(scrapy.Spider):
             )
     def parse(self, response):
         
-        table = response.xpath("//table[contains(@class, 'results')]")
-   
-        rows = table.xpath(".//tr[position()>1]")
-        
-        for row in rows:
+        for row in self.rows_xpath(response.selector.root):
             
-            name = row.xpath(".//td[1]/a/text()").get()
-            link = row.xpath(".//td[1]/a/@href").get()
+            name = self.first(self.name_xpath(row))
+            link = self.first(self.link_xpath(row))
             
            
             if link:
@@ -53,20 +74,24 @@ class FoodScraperSpider(scrapy.Spider):
                 
                 )
         
-        next_page = response.xpath("//a[text()='Next']/@href").get()
+        next_page = self.first(self.next_page_xpath(response.selector.root))
         if next_page:
             yield response.follow(url=next_page, callback=self.parse)
             
 
 
 
+    def first(self, results):
+        # Like SelectorList.get(): first result as a plain str (not tied to the parsed tree) or None
+        return str(results[0]) if results else None
+
     def clean_value(self, value):
         
         if not value:
             return None
         value = str(value).strip()
         value = value.replace('\xa0', ' ')
-        match = re.search(r'[\d\.]+', value)
+        match = self.number_re.search(value)
         
         if match:
             return float(match.group())
@@ -75,13 +100,21 @@ class FoodScraperSpider(scrapy.Spider):
         
         
     def parse_food(self, response, food_name):
+        # Read every nutrient row once instead of scanning the whole page again for each label
+        root = response.selector.root
+        nutrients = {}
+        for row in self.nutrient_rows_xpath(root):
+            label = str(self.nutrient_label_xpath(row))
+            nutrients.setdefault(label, self.first(self.nutrient_value_xpath(row)))
+
         def get_nutrient(label):
-            return response.xpath(f"//tr[td[1]//text()[contains(., '{label}')]]/td[@class='right']/text()").get()
+            # Same "contains" match as before, first row in page order wins
+            return next((value for name, value in nutrients.items() if label in name), None)
 
         yield {
             'Name': food_name,
            
-            'Calories': self.clean_value(response.xpath('//td[@id="calories"]/text()').get()),
+            'Calories': self.clean_value(self.first(self.calories_xpath(root))),
             
             'Fat':           self.clean_value(get_nutrient('Fat')),
             'Carbohydrate':  self.clean_value(get_nutrient('Carbohydrate')),